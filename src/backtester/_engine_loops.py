@@ -0,0 +1,84 @@
+"""
+src/backtester/_engine_loops.py
+
+Purpose: This module contains the compiled inner loops used by the backtesting engine.
+"""
+import numpy as np
+import sys
+import os
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+from src.utils._njit import njit
+
+BUY = 1
+SELL = -1
+
+# Trade side booked for each (previous position, new signal) pair, indexed by value + 1.
+# Opening a short from flat books no trade; covering a short is a BUY.
+_TRANSITIONS = np.array([
+    # new: -1    0     1
+    [0,    BUY,  BUY],  # previous -1
+    [0,    0,    BUY],  # previous 0
+    [SELL, SELL, 0],    # previous 1
+], dtype=np.int8)
+
+@njit(cache=True)
+def _walk(signal, close_prices, initial_balance):
+    """
+    Walks the signal series once, tracking position and balance.
+
+    Args:
+        signal (np.ndarray): int8 signals (1 for long, -1 for short, 0 for no position).
+        close_prices (np.ndarray): float64 close prices aligned with the signals.
+        initial_balance (float): Starting balance for the backtest.
+
+    Returns:
+        tuple: Bar positions, sides (1 for BUY, -1 for SELL) and prices of the trades, and the final balance.
+    """
+    n = signal.shape[0]
+    indices = np.empty(n, np.int64)
+    sides = np.empty(n, np.int8)
+    prices = np.empty(n, np.float64)
+    balance = initial_balance
+    position = 0
+    count = 0
+    for i in range(n):
+        s = signal[i]
+        side = _TRANSITIONS[position + 1, s + 1]
+        if side != 0:
+            price = close_prices[i]
+            indices[count] = i
+            sides[count] = side
+            prices[count] = price
+            count += 1
+            # A BUY pays the price, a SELL receives it
+            balance -= side * price
+        position = s
+    return indices[:count], sides[:count], prices[:count], balance
+
+@njit(cache=True)
+def _simulate(signal, close_prices, order, initial_balance):
+    """
+    Replays the bars in the given order and returns the total return, without recording trades.
+
+    Args:
+        signal (np.ndarray): int8 signals (1 for long, -1 for short, 0 for no position).
+        close_prices (np.ndarray): float64 close prices aligned with the signals.
+        order (np.ndarray): Bar positions in the order they are replayed.
+        initial_balance (float): Starting balance for the backtest.
+
+    Returns:
+        float: Total return of the replay.
+    """
+    balance = initial_balance
+    position = 0
+    for i in order:
+        s = signal[i]
+        side = _TRANSITIONS[position + 1, s + 1]
+        if side != 0:
+            balance -= side * close_prices[i]
+        position = s
+    return (balance - initial_balance) / initial_balance
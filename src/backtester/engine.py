@@ -7,11 +7,40 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
 
 # Add the project root to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
+from src.backtester._engine_loops import _walk, _simulate, BUY
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# Below this many bars NumExpr's setup cost outweighs its fused evaluation
+NUMEXPR_MIN_ROWS = 10000
+
+def _mc_worker(seed: int, signal: np.ndarray, close_prices: np.ndarray, initial_balance: float) -> float:
+    """
+    Runs a single Monte Carlo simulation on a shuffled ordering of the bars.
+
+    Args:
+        seed (int): Seed for the bar permutation.
+        signal (np.ndarray): int8 signals computed once on the original data.
+        close_prices (np.ndarray): float64 close prices aligned with the signals.
+        initial_balance (float): Starting balance for the backtest.
+
+    Returns:
+        float: Total return of the simulation.
+    """
+    permutation = np.random.default_rng(seed).permutation(len(signal))
+    return _simulate(signal, close_prices, permutation, initial_balance)
+
 class Backtester:
     def __init__(self, data: pd.DataFrame, initial_balance: float = 10000.0):
         """
@@ -27,11 +56,41 @@ class Backtester:
         self.position = 0  # 1 for long, -1 for short, 0 for no position
         self.trades = []
 
+    @property
+    def trades(self) -> list:
+        """
+        Executed trades as (date, action, price) tuples.
+        """
+        return self._trades
+
+    @trades.setter
+    def trades(self, trades: list):
+        # Replacing the trades invalidates the bar positions cached by execute_trades
+        self._trades = trades
+        self._trade_positions = None
+        self._trade_cash_flows = None
+
+    def _signal_array(self) -> np.ndarray:
+        """
+        Returns the 'Signal' column as int8 signals.
+        """
+        # Read from the column on every call so later edits to it are never missed.
+        # Signals are truncated to integers; NaN and values outside {-1, 0, 1} keep
+        # the previous position, which also keeps the transition lookup in bounds.
+        signal = np.trunc(self.data['Signal'].to_numpy(np.float64))
+        signal[np.abs(signal) > 1] = np.nan
+        return pd.Series(signal).ffill().fillna(0).to_numpy(np.int8)
+
+    def _close_array(self) -> np.ndarray:
+        """
+        Returns the 'Close' column as float64 prices (no copy for float64 columns).
+        """
+        return self.data['Close'].to_numpy(np.float64)
+
     def generate_signals(self):
         """
         Generates trading signals based on technical indicators.
         """
-        self.data['Signal'] = 0
         # Assuming default MA columns (MA_20 for short, MA_50 for long)
         short_ma = 'MA_20'
         long_ma = 'MA_50'
@@ -44,89 +103,90 @@ class Backtester:
             short_ma = ma_columns[0]  # shorter period first
             long_ma = ma_columns[1]   # longer period second
             
-        self.data.loc[self.data[short_ma] > self.data[long_ma], 'Signal'] = 1
-        self.data.loc[self.data[short_ma] < self.data[long_ma], 'Signal'] = -1
+        # 1 when short MA is above long MA, -1 when below, 0 otherwise (incl. NaN)
+        short_values = self.data[short_ma].to_numpy()
+        long_values = self.data[long_ma].to_numpy()
+        if ne is not None and len(short_values) >= NUMEXPR_MIN_ROWS:
+            signal = ne.evaluate('where(s > l, 1, where(s < l, -1, 0))',
+                                 local_dict={'s': short_values, 'l': long_values})
+        else:
+            signal = np.sign(np.nan_to_num(short_values - long_values, nan=0.0))
+        self.data['Signal'] = signal.astype(np.int8)
 
     def execute_trades(self):
         """
         Executes trades based on generated signals.
         """
-        for index, row in self.data.iterrows():
-            # Ensure we have scalar values for signal
-            try:
-                signal = row['Signal']
-                if hasattr(signal, 'iloc'):  # If it's a Series, get the first value
-                    signal = signal.iloc[0] if len(signal) > 0 else 0
-                
-                close_price = row['Close']
-                if hasattr(close_price, 'iloc'):  # If it's a Series, get the first value  
-                    close_price = close_price.iloc[0] if len(close_price) > 0 else 0
-                    
-            except (KeyError, IndexError):
-                continue
-            
-            # Skip if signal is NaN
-            if pd.isna(signal):
-                continue
-                
-            signal = int(signal) if not pd.isna(signal) else 0
-                
-            if signal == 1 and self.position <= 0:  # Buy signal
-                self.trades.append((index, 'BUY', close_price))
-                self.position = 1
-                self.balance -= close_price
-            elif signal == -1 and self.position >= 0:  # Sell signal
-                if self.position == 1:
-                    self.trades.append((index, 'SELL', close_price))
-                    self.balance += close_price
-                self.position = -1
-                self.balance += close_price
-                self.balance -= close_price
-                self.position = -1
-            elif signal == 0 and self.position != 0:  # Close position
-                if self.position == 1:
-                    self.trades.append((index, 'SELL', close_price))
-                    self.balance += close_price
-                elif self.position == -1:
-                    self.trades.append((index, 'BUY', close_price))
-                    self.balance -= close_price
-                self.position = 0
+        signal = self._signal_array()
+        close_prices = self._close_array()
+        # The position follows the signal, so only bars where it changes can trade
+        changes = np.flatnonzero(np.diff(signal, prepend=0))
+        indices, sides, prices, balance = _walk(signal[changes], close_prices[changes], float(self.initial_balance))
+        indices = changes[indices]
+
+        actions = np.where(sides == BUY, 'BUY', 'SELL').tolist()
+        # Materialize via tolist() so the tuples hold plain Python scalars
+        self.trades = list(zip(self.data.index[indices].tolist(), actions, prices.tolist()))
+        self._trade_positions = indices
+        self._trade_cash_flows = -sides * prices
+        self.position = int(signal[-1]) if len(signal) else 0
+        self.balance = balance
 
     def calculate_performance(self):
         """
         Calculates the performance of the backtest.
         """
-        self.data['Portfolio Value'] = self.initial_balance
-        for trade in self.trades:
-            date, action, price = trade
-            if action == 'BUY':
-                self.balance -= price
-            elif action == 'SELL':
-                self.balance += price
-            self.data.loc[date:, 'Portfolio Value'] = self.balance
-
+        # Book each trade's cash flow on its bar, then carry it forward in one pass
+        n = len(self.data)
+        deltas = np.zeros(n)
+        if self._trade_positions is not None and len(self._trade_positions) == len(self.trades):
+            # Integer positions recorded by execute_trades, no label lookups needed
+            positions, cash_flows = self._trade_positions, self._trade_cash_flows
+        elif self.trades:
+            # Trades set from outside: a trade counts from the first bar on or after its date
+            dates, actions, prices = zip(*self.trades)
+            positions = self.data.index.searchsorted(list(dates), side='left')
+            prices = np.asarray(prices, dtype=np.float64)
+            cash_flows = np.where(np.asarray(actions) == 'SELL', prices, -prices)
+        else:
+            positions, cash_flows = np.empty(0, np.int64), np.empty(0)
+        # Trades dated after the last bar change the balance but no portfolio value
+        in_range = positions < n
+        if in_range.any():
+            # bincount scatters the flows in one contiguous pass (np.add.at is unbuffered)
+            deltas = np.bincount(positions[in_range], weights=cash_flows[in_range], minlength=n)
+        self.data['Portfolio Value'] = self.initial_balance + np.cumsum(deltas)
+
+        self.balance = self.initial_balance + cash_flows.sum()
         total_return = (self.balance - self.initial_balance) / self.initial_balance
         return total_return, self.data['Portfolio Value']
 
-    def monte_carlo_backtest(self, n_simulations: int = 100000):
+    def monte_carlo_backtest(self, n_simulations: int = 100000, n_jobs: Optional[int] = None,
+                             random_state: Optional[int] = None):
         """
         Performs Monte Carlo simulations to evaluate strategy robustness.
 
         Args:
             n_simulations (int): Number of Monte Carlo simulations to run.
+            n_jobs (Optional[int]): Number of worker processes, defaults to the CPU count.
+            random_state (Optional[int]): Seed for reproducible simulations.
 
         Returns:
             list: List of total returns from each simulation.
         """
-        returns = []
-        for _ in range(n_simulations):
-            shuffled_data = self.data.sample(frac=1).reset_index(drop=True)
-            self.__init__(shuffled_data, self.initial_balance)
-            self.generate_signals()
-            self.execute_trades()
-            total_return, _ = self.calculate_performance()
-            returns.append(total_return)
-        return returns
+        # Signals are computed row by row, so shuffling the bars only reorders them;
+        # compute them once and let each simulation permute the cached arrays.
+        self.generate_signals()
+        worker = partial(_mc_worker, signal=self._signal_array(), close_prices=self._close_array(),
+                         initial_balance=float(self.initial_balance))
+        seeds = np.random.SeedSequence(random_state).generate_state(n_simulations).tolist()
+
+        max_workers = n_jobs or os.cpu_count() or 1
+        if max_workers == 1:
+            return [worker(seed) for seed in seeds]
+        chunksize = max(1, n_simulations // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(worker, seeds, chunksize=chunksize))
 
     def forward_test(self, new_data: pd.DataFrame):
         """
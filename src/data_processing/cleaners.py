@@ -7,32 +7,43 @@ Purpose: This module contains functions for cleaning and preprocessing financial
 import pandas as pd
 import numpy as np
 import yfinance as yf
-import sys, os
+from numpy.lib.stride_tricks import sliding_window_view
+import sys, os, time
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
 
-def download_raw_data(ticker: str, start_date : str, end_date :str) -> pd.DataFrame:
+from src.utils._njit import njit, NUMBA_AVAILABLE
+
+# Cached Yahoo Finance downloads older than this are fetched again
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+def download_raw_data(ticker: str, start_date : str, end_date :str, max_cache_age: float = CACHE_TTL_SECONDS) -> pd.DataFrame:
     """
-    Downloads raw financial data from Yahoo Finance.
+    Downloads raw financial data from Yahoo Finance, reusing a recent Parquet cache when available.
 
     Args:
         ticker (str): Stock ticker symbol.
         start_date (str): Start date for data in 'YYYY-MM-DD' format.
         end_date (str): End date for data in 'YYYY-MM-DD' format.
+        max_cache_age (float): Maximum age in seconds of a cached download before it is fetched again.
 
     Returns:
         pd.DataFrame: Raw financial data.
     """
+    # Use absolute path for the cache
+    script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    raw_data_path = os.path.join(script_dir, "data", "raw", f"{ticker}_{start_date}_{end_date}.parquet")
+    if os.path.exists(raw_data_path) and time.time() - os.path.getmtime(raw_data_path) < max_cache_age:
+        return pd.read_parquet(raw_data_path)
+
     df = yf.download(ticker, start=start_date, end=end_date)
     if df is not None and not df.empty:
         # Flatten multi-level columns if they exist
         if isinstance(df.columns, pd.MultiIndex):
             df.columns = df.columns.get_level_values(0)
-        
-        # Use absolute path for saving
-        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        raw_data_path = os.path.join(script_dir, "data", "raw", f"{ticker}_raw.csv")
-        df.to_csv(raw_data_path)
+
+        df.to_parquet(raw_data_path, compression='snappy')
         return df
     else:
      return pd.DataFrame()
@@ -46,11 +57,16 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Cleaned financial data.
     """
-    # Remove duplicates
-    df = df.drop_duplicates()
+    # Remove duplicates; rows on distinct dates are distinct bars, so the scan
+    # is only skipped for a unique DatetimeIndex
+    if not (isinstance(df.index, pd.DatetimeIndex) and df.index.is_unique):
+        df = df.drop_duplicates()
 
-    # Handle missing values by forward filling
-    df = df.ffill().bfill()
+    # Handle missing values by forward filling, then back filling the leading
+    # gap in place. ffill always returns a new frame, so the caller's data is
+    # never modified and the bfill needs no second copy.
+    df = df.ffill()
+    df.bfill(inplace=True)
 
     # Ensure the index is a datetime index
     if not pd.api.types.is_datetime64_any_dtype(df.index):
@@ -58,7 +74,127 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def add_technical_indicators(df: pd.DataFrame, long : int, short: int) -> pd.DataFrame:
+@njit(cache=True)
+def _rolling_mean_nb(x, window):
+    """
+    Rolling mean carried as a running sum, O(N) regardless of the window length.
+    Sums accumulate in float64 whatever the input dtype; the output keeps the input dtype.
+    Windows containing a NaN yield NaN, matching pandas' default min_periods.
+    """
+    n = x.shape[0]
+    out = np.empty(n, x.dtype)
+    total = 0.0
+    nan_count = 0
+    for i in range(n):
+        value = x[i]
+        if np.isnan(value):
+            nan_count += 1
+        else:
+            total += value
+        if i >= window:
+            old = x[i - window]
+            if np.isnan(old):
+                nan_count -= 1
+            else:
+                total -= old
+        if i >= window - 1 and nan_count == 0:
+            out[i] = total / window
+        else:
+            out[i] = np.nan
+    return out
+
+@njit(cache=True)
+def _rolling_std_nb(x, window):
+    """
+    Rolling sample standard deviation (ddof=1) with Welford's update for a sliding window.
+    The running mean carries a Kahan compensation term and the squared deviations (M2)
+    are updated directly, avoiding the cancellation of the sum-of-squares formula on
+    large-magnitude inputs such as price levels. Both are recomputed exactly once per
+    window so accumulated rounding stays bounded.
+    """
+    n = x.shape[0]
+    out = np.empty(n, x.dtype)
+    mean = 0.0
+    compensation = 0.0
+    m2 = 0.0
+    count = 0
+    nan_count = 0
+    for i in range(n):
+        if i >= window:
+            old = x[i - window]
+            if np.isnan(old):
+                nan_count -= 1
+            else:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    compensation = 0.0
+                    m2 = 0.0
+                else:
+                    previous_mean = mean - compensation
+                    y = old - compensation
+                    t = y - mean
+                    compensation = t + mean - y
+                    mean -= t / count
+                    m2 -= (old - previous_mean) * (old - mean)
+        value = x[i]
+        if np.isnan(value):
+            nan_count += 1
+        else:
+            count += 1
+            previous_mean = mean - compensation
+            y = value - compensation
+            t = y - mean
+            compensation = t + mean - y
+            mean += t / count
+            m2 += (value - previous_mean) * (value - mean)
+        if i >= window - 1 and nan_count == 0 and (i + 1) % window == 0:
+            # Resync from a two-pass sum once per window so rounding cannot drift;
+            # this adds O(window) work every window steps, keeping the total O(N)
+            mean = 0.0
+            for j in range(i - window + 1, i + 1):
+                mean += x[j]
+            mean /= window
+            m2 = 0.0
+            for j in range(i - window + 1, i + 1):
+                m2 += (x[j] - mean) * (x[j] - mean)
+            compensation = 0.0
+        if window > 1 and i >= window - 1 and nan_count == 0:
+            out[i] = np.sqrt(m2 / (window - 1)) if m2 > 0.0 else 0.0
+        else:
+            out[i] = np.nan
+    return out
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean of a 1-D array, using the compiled kernel when numba is available
+    and a fused reduction over a strided window view otherwise.
+    """
+    # Integer input cannot hold the NaN warm-up values
+    if not np.issubdtype(x.dtype, np.floating):
+        x = x.astype(np.float64)
+    if NUMBA_AVAILABLE:
+        return _rolling_mean_nb(x, window)
+    out = np.full(x.shape[0], np.nan, dtype=x.dtype)
+    if x.shape[0] >= window:
+        out[window - 1:] = sliding_window_view(x, window).mean(axis=-1)
+    return out
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sample standard deviation of a 1-D array, using the compiled kernel when numba is available
+    and a fused reduction over a strided window view otherwise.
+    """
+    if not np.issubdtype(x.dtype, np.floating):
+        x = x.astype(np.float64)
+    if NUMBA_AVAILABLE:
+        return _rolling_std_nb(x, window)
+    out = np.full(x.shape[0], np.nan, dtype=x.dtype)
+    if x.shape[0] >= window > 1:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=-1, ddof=1)
+    return out
+
+def add_technical_indicators(df: pd.DataFrame, long : int, short: int, dtype: type = np.float32) -> pd.DataFrame:
     """
     Adds technical indicators to the financial data.
 
@@ -66,23 +202,27 @@ def add_technical_indicators(df: pd.DataFrame, long : int, short: int) -> pd.Dat
         df (pd.DataFrame): Cleaned financial data.
         long (int): Long window for moving average.
         short (int): Short window for moving average.
+        dtype (type): Float dtype of the moving average and volatility columns.
 
     Returns:
         pd.DataFrame: Financial data with technical indicators.
     """
     # Calculate moving averages
-    df[f'MA_{long}'] = df['Close'].rolling(window=long).mean()
-    df[f'MA_{short}'] = df['Close'].rolling(window=short).mean()
+    # Close itself stays float64 for accounting; the indicators only need dtype precision
+    close = df['Close'].to_numpy(dtype)
+    df[f'MA_{long}'] = _rolling_mean(close, long)
+    df[f'MA_{short}'] = _rolling_mean(close, short)
 
     # Calculate daily returns
     df['Daily_Return'] = df['Close'].pct_change()
 
     # Calculate volatility (standard deviation of daily returns)
-    df['Volatility'] = df['Daily_Return'].rolling(window=short).std()
+    df['Volatility'] = _rolling_std(df['Daily_Return'].to_numpy(dtype), short)
 
     return df
 
-def preprocess_data(ticker: str, start_date: str, end_date: str, long: int = 50, short: int = 20) -> pd.DataFrame:
+def preprocess_data(ticker: str, start_date: str, end_date: str, long: int = 50, short: int = 20,
+                    downcast: bool = False) -> pd.DataFrame:
     """
     Preprocesses the financial data by downloading, cleaning, and adding technical indicators.
 
@@ -92,6 +232,7 @@ def preprocess_data(ticker: str, start_date: str, end_date: str, long: int = 50,
         end_date (str): End date for data in 'YYYY-MM-DD' format.
         long (int): Long window for moving average.
         short (int): Short window for moving average.
+        downcast (bool): If True, downcast float columns to the smallest float dtype (float32).
 
     Returns:
         pd.DataFrame: Preprocessed financial data.
@@ -102,7 +243,12 @@ def preprocess_data(ticker: str, start_date: str, end_date: str, long: int = 50,
     
     cleaned_data = clean_data(raw_data)
     processed_data = add_technical_indicators(cleaned_data, long, short)
-    
+
+    if downcast:
+        # Integer columns such as Volume are left alone; float32 cannot hold them exactly
+        float_columns = processed_data.select_dtypes(include='float').columns
+        processed_data[float_columns] = processed_data[float_columns].apply(pd.to_numeric, downcast='float')
+
     # Use absolute path for saving
     script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     processed_data_path = os.path.join(script_dir, "data", "processed", f"{ticker}_processed.parquet")
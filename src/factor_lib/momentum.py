@@ -6,6 +6,7 @@ Purpose: This module contains functions to calculate momentum-based factors for
 import pandas as pd
 import numpy as np
 from typing import List, Optional
+from scipy.stats import rankdata
 
 import sys, os 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,8 +24,13 @@ def calculate_momentum(df: pd.DataFrame, window: int = 90) -> pd.Series:
     Returns:
         pd.Series: Momentum values.
     """
-    momentum = df['Close'].pct_change(periods=window)
-    return momentum
+    if window < 1:
+        raise ValueError(f"Momentum window must be at least 1, got {window}.")
+    close = df['Close'].to_numpy(np.float64)
+    momentum = np.empty_like(close)
+    momentum[:window] = np.nan
+    momentum[window:] = close[window:] / close[:-window] - 1.0
+    return pd.Series(momentum, index=df.index, name='Momentum')
 def rank_stocks_by_momentum(df: pd.DataFrame, momentum_col: str) -> pd.Series:
     """
     Rank stocks based on their momentum values.
@@ -34,8 +40,12 @@ def rank_stocks_by_momentum(df: pd.DataFrame, momentum_col: str) -> pd.Series:
     Returns:
         pd.Series: Ranks of stocks based on momentum.
     """
-    ranks = df[momentum_col].rank(ascending=False)
-    return ranks
+    values = df[momentum_col].to_numpy(np.float64)
+    ranks = np.full(values.shape, np.nan)
+    valid = ~np.isnan(values)
+    # Descending rank with ties averaged; NaNs stay unranked
+    ranks[valid] = rankdata(-values[valid], method='average')
+    return pd.Series(ranks, index=df.index, name=momentum_col)
 def generate_momentum_signal(df: pd.DataFrame, momentum_col: str, threshold: Optional[float] = None) -> pd.Series:
     """
     Generate trading signals based on momentum ranks.
@@ -48,15 +58,18 @@ def generate_momentum_signal(df: pd.DataFrame, momentum_col: str, threshold: Opt
     Returns:
         pd.Series: Trading signals (1 for buy, -1 for sell, 0 for hold).
     """
-    signals = pd.Series(0, index=df.index)
+    values = df[momentum_col].to_numpy(np.float64)
     if threshold is not None:
-        signals[df[momentum_col] <= threshold] = 1  # Buy signal
-        signals[df[momentum_col] > threshold] = -1  # Sell signal
+        buy = values <= threshold
+        sell = values > threshold
     else:
-        median_rank = df[momentum_col].median()
-        signals[df[momentum_col] < median_rank] = 1  # Buy signal
-        signals[df[momentum_col] > median_rank] = -1  # Sell signal
-    return signals
+        valid = values[~np.isnan(values)]
+        median_rank = np.median(valid) if valid.size else np.nan
+        buy = values < median_rank
+        sell = values > median_rank
+    # NaN ranks compare False on both sides and stay at 0 (hold)
+    signals = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+    return pd.Series(signals, index=df.index)
 
 def apply_momentum_strategy(df: pd.DataFrame, window: int = 90, threshold: Optional[float] = None) -> pd.DataFrame:
     """
@@ -94,7 +107,7 @@ class MomentumBacktester(Backtester):
         if 'Signal' not in self.data.columns:
             raise ValueError("Data must contain a 'Signal' column for momentum strategy.")
         # Signals are already generated in the data
-        self.data['Signal'] = self.data['Signal'].fillna(0).astype(int)
+        self.data['Signal'] = self.data['Signal'].fillna(0).to_numpy(np.int8)
     def execute_trades(self):
         """
         Executes trades based on momentum signals.
@@ -0,0 +1,21 @@
+"""
+src/utils/_njit.py
+
+Purpose: Optional numba JIT decorator that falls back to plain Python when numba is not installed.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit, usable both as @njit and @njit(...).
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
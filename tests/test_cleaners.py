@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.data_processing import cleaners
+
+def _series():
+    rng = np.random.default_rng(0)
+    prices = 150.0 + rng.standard_normal(500).cumsum()
+    prices[[10, 11, 300]] = np.nan
+    return prices
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def numba_available(request, monkeypatch):
+    if request.param and not cleaners.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(cleaners, "NUMBA_AVAILABLE", request.param)
+    return request.param
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_rolling_mean_matches_pandas(numba_available, window):
+    x = _series()
+    expected = pd.Series(x).rolling(window=window).mean().to_numpy()
+    np.testing.assert_allclose(cleaners._rolling_mean(x, window), expected, rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_rolling_std_matches_pandas(numba_available, window):
+    # Price levels exercise cancellation in the variance update
+    x = _series()
+    expected = pd.Series(x).rolling(window=window).std().to_numpy()
+    np.testing.assert_allclose(cleaners._rolling_std(x, window), expected, rtol=1e-9, atol=1e-9)
+
+def test_rolling_helpers_accept_integer_input(numba_available):
+    x = np.arange(5)
+    np.testing.assert_allclose(cleaners._rolling_mean(x, 2), [np.nan, 0.5, 1.5, 2.5, 3.5])
+    np.testing.assert_allclose(cleaners._rolling_std(x, 2), [np.nan] + [np.sqrt(0.5)] * 4)
+
+def test_clean_data_drops_duplicate_rows_without_datetime_index():
+    cleaned = cleaners.clean_data(pd.DataFrame({"Close": [1.0, 1.0, 2.0]}))
+    assert cleaned["Close"].tolist() == [1.0, 2.0]
+
+def test_clean_data_keeps_repeated_values_on_distinct_dates():
+    raw = pd.DataFrame({"Close": [1.0, 1.0, 2.0]}, index=pd.date_range("2020-01-01", periods=3))
+    cleaned = cleaners.clean_data(raw)
+    assert cleaned["Close"].tolist() == [1.0, 1.0, 2.0]
+    assert cleaned is not raw
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import sys, os
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtester.engine import Backtester
+from src.backtester._engine_loops import _simulate
+
+def _reference_trades(signals, close_prices, initial_balance):
+    """
+    Row-by-row trade logic of the original execute_trades loop.
+    """
+    balance, position, trades = initial_balance, 0, []
+    for i, (signal, close_price) in enumerate(zip(signals, close_prices)):
+        if pd.isna(signal):
+            continue
+        signal = int(signal)
+        if signal == 1 and position <= 0:
+            trades.append((i, 'BUY', close_price))
+            position = 1
+            balance -= close_price
+        elif signal == -1 and position >= 0:
+            if position == 1:
+                trades.append((i, 'SELL', close_price))
+                balance += close_price
+            position = -1
+        elif signal == 0 and position != 0:
+            if position == 1:
+                trades.append((i, 'SELL', close_price))
+                balance += close_price
+            elif position == -1:
+                trades.append((i, 'BUY', close_price))
+                balance -= close_price
+            position = 0
+    return trades, balance, position
+
+def _frame(signal, close=None):
+    index = pd.date_range("2020-01-01", periods=len(signal))
+    if close is None:
+        close = np.arange(1, len(signal) + 1, dtype=float)
+    return pd.DataFrame({"Close": close, "Signal": signal}, index=index)
+
+def test_calculate_performance_without_trades():
+    # Flat and short-from-flat signals book no trades
+    for signal in ([0, 0, 0, 0], [-1, -1, -1, -1]):
+        backtester = Backtester(_frame(signal), initial_balance=100.0)
+        backtester.execute_trades()
+        total_return, portfolio_value = backtester.calculate_performance()
+        assert backtester.trades == []
+        assert total_return == 0.0
+        assert portfolio_value.tolist() == [100.0] * 4
+
+def test_calculate_performance_on_empty_frame():
+    backtester = Backtester(_frame([]), initial_balance=100.0)
+    backtester.execute_trades()
+    total_return, portfolio_value = backtester.calculate_performance()
+    assert total_return == 0.0
+    assert portfolio_value.empty
+
+def test_calculate_performance_uses_replaced_trades():
+    data = _frame([1, 1, 0, 0])
+    backtester = Backtester(data, initial_balance=100.0)
+    backtester.execute_trades()
+    total_return, portfolio_value = backtester.calculate_performance()
+    assert portfolio_value.tolist() == [99.0, 99.0, 102.0, 102.0]
+    assert total_return == 0.02
+
+    backtester.trades = [(data.index[1], 'BUY', 2.0)]
+    total_return, portfolio_value = backtester.calculate_performance()
+    assert portfolio_value.tolist() == [100.0, 98.0, 98.0, 98.0]
+    assert total_return == -0.02
+
+def test_calculate_performance_with_trades_assigned_before_execution():
+    data = _frame([0, 0, 0, 0])
+    backtester = Backtester(data, initial_balance=100.0)
+    backtester.trades = [(data.index[1], 'BUY', 2.0)]
+    total_return, portfolio_value = backtester.calculate_performance()
+    assert portfolio_value.tolist() == [100.0, 98.0, 98.0, 98.0]
+    assert total_return == -0.02
+
+def test_calculate_performance_with_trade_dates_between_bars():
+    index = pd.to_datetime(["2020-01-02", "2020-01-03", "2020-01-06", "2020-01-07"])
+    data = pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0]}, index=index)
+    backtester = Backtester(data, initial_balance=100.0)
+    # A weekend trade counts from the next bar; one after the last bar only moves the balance
+    backtester.trades = [(pd.Timestamp("2020-01-04"), 'BUY', 3.0),
+                         (pd.Timestamp("2020-01-10"), 'SELL', 5.0)]
+    total_return, portfolio_value = backtester.calculate_performance()
+    assert portfolio_value.tolist() == [100.0, 100.0, 97.0, 97.0]
+    assert total_return == 0.02
+
+def test_execute_trades_reads_edited_signal_column():
+    data = _frame([0, 0, 0, 0])
+    data['MA_20'] = [2.0, 2.0, 2.0, 2.0]
+    data['MA_50'] = [1.0, 1.0, 1.0, 1.0]
+    backtester = Backtester(data, initial_balance=100.0)
+    backtester.generate_signals()
+    assert data['Signal'].tolist() == [1, 1, 1, 1]
+
+    data['Signal'] = 0
+    backtester.execute_trades()
+    assert backtester.trades == []
+
+def test_execute_trades_transitions():
+    close = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    # Shorting from flat books nothing; covering the short on 0 is a BUY
+    backtester = Backtester(_frame([-1, -1, 0, 1, np.nan, -1], close), initial_balance=100.0)
+    backtester.execute_trades()
+    positions = [backtester.data.index.get_loc(date) for date, _, _ in backtester.trades]
+    assert [action for _, action, _ in backtester.trades] == ['BUY', 'BUY', 'SELL']
+    assert positions == [2, 3, 5]
+    assert backtester.position == -1
+    assert backtester.balance == 100.0 - 3.0 - 4.0 + 6.0
+
+def test_execute_trades_matches_reference_loop():
+    rng = np.random.default_rng(0)
+    for trial in range(500):
+        n = int(rng.integers(0, 40))
+        signal = rng.choice([-1.0, 0.0, 1.0, np.nan, 2.0, -3.0, 0.5], size=n)
+        close = rng.uniform(50.0, 150.0, size=n)
+        backtester = Backtester(_frame(signal, close), initial_balance=1000.0)
+        backtester.execute_trades()
+        trades, balance, position = _reference_trades(signal, close, 1000.0)
+        index = backtester.data.index
+        assert backtester.trades == [(index[i], action, price) for i, action, price in trades]
+        assert np.isclose(backtester.balance, balance)
+        assert backtester.position == position
+
+        # The Monte Carlo kernel replays the same state machine
+        total_return, _ = backtester.calculate_performance()
+        replayed = _simulate(backtester._signal_array(), close, np.arange(n), 1000.0)
+        assert np.isclose(replayed, total_return)
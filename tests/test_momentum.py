@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.factor_lib.momentum import calculate_momentum
+
+def test_calculate_momentum_matches_pct_change():
+    df = pd.DataFrame({"Close": [100.0, 110.0, 121.0, 90.0]}, index=pd.date_range("2020-01-01", periods=4))
+    momentum = calculate_momentum(df, window=2)
+    expected = df['Close'].pct_change(periods=2)
+    np.testing.assert_allclose(momentum.to_numpy(), expected.to_numpy())
+
+def test_calculate_momentum_rejects_non_positive_window():
+    df = pd.DataFrame({"Close": [100.0, 110.0]})
+    with pytest.raises(ValueError):
+        calculate_momentum(df, window=0)